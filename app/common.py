@@ -1,21 +1,76 @@
 import streamlit as st
-import json
-from core import Rectangle, CrossSection
+import hashlib
+import numpy as np
+from core import CrossSection, RECT_DTYPE
+
+try:
+    import orjson
+except ImportError: # orjson is optional, fall back to the standard library
+    orjson = None
+    import json
+
+def _loads(raw):
+    """Parse a JSON document from bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dumps(payload):
+    """Serialize a payload to indented JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, indent=2).encode("utf-8")
+
+def _number(value, field):
+    """Return a rectangle dimension from the file unchanged, after checking that it is a number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    return value
+
+@st.cache_data(max_entries=8)
+def _parse_geometry(raw):
+    """
+    Parse the contents of an uploaded geometry file into a rectangle array and glue connections.
+
+    The result is cached by Streamlit on the file contents, so uploading the same file again,
+    for example after switching input modes, skips parsing it.
+
+    Parameters:
+    raw (bytes): The contents of the uploaded JSON file.
+
+    Returns:
+    tuple: A RECT_DTYPE array with one record per rectangle, the same rectangles as tuples with
+           the values from the file, and a list of glue connection dictionaries.
+
+    Raises:
+    ValueError: If a rectangle dimension is not a number.
+    """
+    data = _loads(raw)
+    rectangles = data.get("rectangles") or []
+    glue_connections = data.get("glue_connections") or []
+    rows = [
+        (_number(rect_data["width"], "width"), _number(rect_data["height"], "height"),
+         _number(rect_data["position"], "position"),
+         0 if rect_data.get("position_x") is None else _number(rect_data["position_x"], "position_x"))
+        for rect_data in rectangles
+    ]
+    return np.array(rows, dtype=RECT_DTYPE), rows, glue_connections
 
 def get_geometry():
     """
     Retrieve or initialize the geometry object in the session state.
 
-    This function checks if the "geometry" key exists in the Streamlit session state.
+    This function looks up the "geometry" key in the Streamlit session state once.
     If it does not exist, it initializes it with a new CrossSection object.
     It then returns the geometry object from the session state.
 
     Returns:
         CrossSection: The geometry object stored in the session state.
     """
-    if "geometry" not in st.session_state:
-        st.session_state.geometry = CrossSection()
-    return st.session_state.geometry
+    geometry = st.session_state.get("geometry")
+    if geometry is None:
+        geometry = st.session_state.geometry = CrossSection()
+    return geometry
 
 def reset_geometry():
     """
@@ -23,15 +78,59 @@ def reset_geometry():
 
     This function sets the 'geometry' attribute of the Streamlit session state to a new 
     instance of the CrossSection class, effectively resetting any previous geometry data.
+    It also forgets which uploaded file the previous geometry was loaded from.
     """
     st.session_state.geometry = CrossSection()
+    st.session_state.pop("geometry_file_hash", None)
+
+@st.cache_data(max_entries=32)
+def _section_properties(rectangles):
+    """
+    Calculate the section properties for a set of rectangles.
+
+    The result is cached by Streamlit on the rectangle dimensions, so reruns that do not
+    change the geometry skip the calculation entirely.
+
+    Parameters:
+    rectangles (tuple): A tuple of (width, height, position, position_x) tuples.
+
+    Returns:
+    tuple: The total area, centroid (Y), centroid (X) and moment of inertia of the section.
+    """
+    section = CrossSection()
+    section.extend_rectangle_array(np.array(list(rectangles), dtype=RECT_DTYPE))
+    return section.calculate_all()
+
+def display_geometry_properties(geometry):
+    """
+    Calculate and display the total area, centroid position, and moment of inertia of the geometry.
+
+    The calculated centroids and moment of inertia are stored on the geometry object, since the
+    beam analysis reads them from there.
+
+    Parameters:
+    geometry (CrossSection): The cross section to display.
+    """
+    rectangles = tuple(geometry.dimensions.tolist())
+    total_area, centroid_y, centroid_x, moment_of_inertia = _section_properties(rectangles)
+    geometry.centroid = centroid_y
+    geometry.centroid_x = centroid_x
+    geometry.I = moment_of_inertia
+
+    st.subheader("Cross-Section Geometry")
+    st.write(f"Total Area: {total_area} mm²")
+    st.write(f"Centroid Position (Y): {centroid_y} mm")
+    st.write(f"Centroid Position (X): {centroid_x} mm")
+    st.write(f"Total Moment of Inertia: {moment_of_inertia} mm⁴")
 
 def upload_geometry_file():
     """
     Handles the upload and processing of a JSON file containing geometric data.
     This function allows the user to upload a JSON file via a Streamlit sidebar file uploader.
     It processes the file to extract rectangle and glue connection data, which are then used
-    to update the geometry object. The function also calculates and displays the total area,
+    to replace the geometry object. The geometry is only replaced once the file has been parsed
+    and contains rectangles. A hash of the file contents is kept in the session state so that
+    reruns with the same file skip it, whether or not it loaded. The function also calculates and displays the total area,
     centroid position, and moment of inertia of the cross-section geometry.
     The JSON file should have the following structure:
     {
@@ -63,88 +162,78 @@ def upload_geometry_file():
     """
     uploaded_file = st.sidebar.file_uploader("Upload JSON file", type=["json"])
     if uploaded_file is not None:
-        geometry = get_geometry()
-        if not geometry.rectangles:
-            try:
-                data = json.load(uploaded_file)
-                
-                # Load Rectangles
-                if "rectangles" in data and data["rectangles"]:
-                    for rect_data in data["rectangles"]:
-                        position_x = rect_data.get("position_x", None)
-                        geometry.add_rectangle(Rectangle(
-                            width=rect_data["width"],
-                            height=rect_data["height"],
-                            position=rect_data["position"],
-                            position_x=position_x
-                        ))
-                    
-                    # Load Glue Connections if they exist
-                    if "glue_connections" in data:
-                        for glue_data in data["glue_connections"]:
-                            geometry.add_glue_connection(
-                                rect1_id=glue_data["rect1"],
-                                rect2_id=glue_data["rect2"],
-                                direction=glue_data["direction"],
-                                thickness=glue_data["thickness"]
-                            )
-                    
-                    st.sidebar.success("Geometry and glue connections loaded.")
-                    total_area = geometry.calculate_total_area()
-                    centroid_y = geometry.calculate_centroid()
-                    centroid_x = geometry.calculate_centroid_x()
-                    moment_of_inertia = geometry.calculate_moment_of_inertia()
-
-                    st.subheader("Cross-Section Geometry")
-                    st.write(f"Total Area: {total_area} mm²")
-                    st.write(f"Centroid Position (Y): {centroid_y} mm")
-                    st.write(f"Centroid Position (X): {centroid_x} mm")
-                    st.write(f"Total Moment of Inertia: {moment_of_inertia} mm⁴")
-                else:
-                    st.sidebar.warning("No rectangles found in the uploaded file.")
-            except Exception as e:
-                st.sidebar.error(f"Error loading file: {e}")
-
-def save_geometry_to_file():
+        # Read the file once, the same bytes are hashed and parsed
+        raw = uploaded_file.getvalue()
+
+        # Streamlit returns the same file on every rerun, skip it if it has already been read.
+        # Files that failed to load are skipped as well, so they are not parsed again on every rerun
+        file_hash = hashlib.blake2b(raw, digest_size=16).digest()
+        if st.session_state.get("geometry_file_hash") == file_hash:
+            return
+
+        try:
+            rectangles, rows, glue_connections = _parse_geometry(raw)
+
+            if len(rectangles):
+                # A different file replaces the current geometry, but only once it has been parsed
+                reset_geometry()
+                geometry = get_geometry()
+
+                # Load Rectangles straight into the geometry's array, without Rectangle objects
+                geometry.extend_rectangle_array(rectangles, rows)
+
+                # Load Glue Connections if they exist
+                geometry.extend_glue_connections(glue_connections)
+
+                st.sidebar.success("Geometry and glue connections loaded.")
+                display_geometry_properties(geometry)
+            else:
+                st.sidebar.warning("No rectangles found in the uploaded file.")
+        except Exception as e:
+            st.sidebar.error(f"Error loading file: {e}")
+        st.session_state.geometry_file_hash = file_hash
+
+def save_geometry_to_file(geometry=None):
     """
     Saves the current geometry to a JSON file and provides a download button in the Streamlit sidebar.
-    The function retrieves the current geometry, which includes rectangles and glue connections.
+    The function uses the given geometry, or retrieves the current one from the session state,
+    which includes rectangles and glue connections.
     If there are any rectangles or glue connections, it converts them into a JSON format and 
     provides a download button in the Streamlit sidebar for the user to download the JSON file.
     If there are no rectangles or glue connections, it displays a warning message in the sidebar.
+    The download button is registered on every rerun, so the JSON is cached on the geometry
+    and only serialized again after the geometry changes.
     The JSON file contains:
     - rectangles: A list of dictionaries, each containing the width, height, and position of a rectangle.
     - glue_connections: A list of dictionaries, each containing the details of a glue connection 
       (rect1, rect2, direction, and thickness).
+    Parameters:
+    geometry (CrossSection, optional): The geometry to save. Callers that already hold the
+                                       geometry pass it in to skip another session state lookup.
     Raises:
         None
     Returns:
         None
     """
-    geometry = get_geometry()
-    if geometry.rectangles or geometry.glue_connections:
-        rect_data = [
-            {
-                "width": rect.width,
-                "height": rect.height,
-                "position": rect.position,
-                "position_x": rect.position_x if hasattr(rect, 'position_x') else None
-            }
-            for rect in geometry.rectangles
-        ]
-        glue_data = [
-            {"rect1": connection["rect1"], "rect2": connection["rect2"],
-             "direction": connection["direction"], "thickness": connection["thickness"]}
-            for connection in geometry.glue_connections
-        ]
-        json_data = json.dumps({
-            "rectangles": rect_data,
-            "glue_connections": glue_data
-        }, indent=4)
-        
+    if geometry is None:
+        geometry = get_geometry()
+    if len(geometry.dimensions) or geometry.glue_connections:
+        # Only serialize again after the geometry has changed
+        if geometry.json_cache is None:
+            rect_data = [dict(zip(RECT_DTYPE.names, row)) for row in geometry.rows]
+            glue_data = [
+                {"rect1": connection["rect1"], "rect2": connection["rect2"],
+                 "direction": connection["direction"], "thickness": connection["thickness"]}
+                for connection in geometry.glue_connections
+            ]
+            geometry.json_cache = _dumps({
+                "rectangles": rect_data,
+                "glue_connections": glue_data
+            })
+
         st.sidebar.download_button(
             label="Download Geometry as JSON",
-            data=json_data,
+            data=geometry.json_cache,
             file_name="cross_section.json",
             mime="application/json"
         )
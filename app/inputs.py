@@ -1,23 +1,41 @@
 import streamlit as st
-from app.studio import get_geometry, save_geometry_to_file
+import numpy as np
+import pandas as pd
+from app.common import get_geometry, save_geometry_to_file
 from core import TrainLoad, Beam
 
+# Spacing between consecutive wheels of the train (in mm from the leftmost end)
+_BASE_POSITIONS = np.array([52, 176, 164, 176, 164, 176], dtype=np.float64)
+_BASE_POSITIONS.setflags(write=False)  # shared by every TrainLoad, so it must never be modified in place
+
 def get_beam_length():
     """Get the length of the beam from the user."""
-    length = st.sidebar.number_input("Beam length (mm):", min_value=1.0, value=1200.0, step=10.0)
+    length = st.number_input("Beam length (mm):", min_value=1.0, value=1200.0, step=10.0)
     return length
 
 def get_supports():
-    """Get the locations of supports from the user."""
-    supports = st.sidebar.text_input("Supports (comma separated, e.g., A, B):", value="A,B").split(",")
-    return supports
+    """
+    Get the locations of supports from the user.
+
+    The parsed supports are kept in the session state and only parsed again when the input changes.
+
+    Returns:
+        tuple: The support names with surrounding whitespace removed.
+    """
+    raw = st.text_input("Supports (comma separated, e.g., A, B):", value="A,B")
+    if st.session_state.get("_supports_raw") != raw:
+        st.session_state._supports_raw = raw
+        st.session_state._supports_parsed = tuple(support.strip() for support in raw.split(","))
+    return st.session_state._supports_parsed
 
 def get_loads():
     """
     Get the applied loads from the user via Streamlit sidebar inputs.
     This function manages the state of applied loads using Streamlit's session state.
     Users can input the position and magnitude of loads, add them to a list, and remove
-    them if needed. The current list of loads is displayed in the sidebar.
+    any of them at once through a single form. The current list of loads is displayed in a table in the sidebar.
+    Note:
+    - main.py does not call this function, the app currently only applies train loads.
     Returns:
         list: A list of tuples where each tuple contains the position (float) and magnitude (float) of a load.
     """
@@ -32,28 +50,36 @@ def get_loads():
     if st.sidebar.button("Add Load"):
         st.session_state.loads.append((load_position, load_magnitude))
 
-    # Display current loads
+    # Remove loads with a single form instead of one button per load
+    loads = st.session_state.loads
+    if loads:
+        with st.sidebar.form("loads_form"):
+            to_remove = st.multiselect("Loads to remove:", options=range(len(loads)),
+                                       format_func=lambda idx: f"Load {idx + 1}")
+            if st.form_submit_button("Remove Loads") and to_remove:
+                to_remove = set(to_remove)
+                st.session_state.loads = [load for idx, load in enumerate(loads) if idx not in to_remove]
+
+    # Display current loads in a single table instead of one element per load
     st.sidebar.write("Current loads:")
-    for idx, (position, magnitude) in enumerate(st.session_state.loads):
-        st.sidebar.write(f"Load {idx + 1}: {magnitude} N at {position} m")
-        if st.sidebar.button(f"Remove Load {idx + 1}", key=f"remove_{idx}"):
-            st.session_state.loads.pop(idx)
+    st.sidebar.dataframe(pd.DataFrame(st.session_state.loads, columns=["Position (mm)", "Magnitude (N)"],
+                                      index=pd.RangeIndex(1, len(st.session_state.loads) + 1, name="Load")))
 
     return st.session_state.loads
 
 def get_number_of_diaphragms():
     """Get the number of diaphragms from the user."""
-    num_diaphragms = st.sidebar.number_input("Number of diaphragms:", min_value=0, value=5, step=1)
+    num_diaphragms = st.number_input("Number of diaphragms:", min_value=0, value=5, step=1)
     return num_diaphragms
 
 def get_train_weight():
     """Get the total weight of the train from the user."""
-    total_weight = st.sidebar.number_input("Total weight of the train (in N):", min_value=0.0, step=100.0, value=400.0)
+    total_weight = st.number_input("Total weight of the train (in N):", min_value=0.0, step=100.0, value=400.0)
     return total_weight
 
 def get_train_position():
     """Get the current position of the train on the bridge (in meters)."""
-    train_position = st.sidebar.number_input("Train position (in mm from the left end of the bridge):", min_value=-100.0, step=1.0, value=0.0)
+    train_position = st.number_input("Train position (in mm from the left end of the bridge):", min_value=-100.0, step=1.0, value=0.0)
     return train_position
 
 def get_train_loads_1():
@@ -63,20 +89,17 @@ def get_train_loads_1():
     Returns:
         TrainLoad: An object containing the following attributes:
             - total_weight (float): The total weight of the train.
-            - weight_per_wheel (list of float): The weight distributed to each of the 6 wheels.
-            - base_positions (list of int): The hardcoded positions of the wheels in millimeters from the leftmost end.
+            - weight_per_wheel (np.ndarray): The weight distributed to each of the 6 wheels.
+            - base_positions (np.ndarray): The hardcoded wheel spacings in millimeters from the leftmost end.
             - train_position (float): The current position of the train.
     """
     total_weight = get_train_weight()
     train_position = get_train_position()
 
-    # Hardcoded wheel positions (in mm from the leftmost end)
-    base_positions = [52, 176, 164, 176, 164, 176]
-
     # Weight per wheel (assuming the total weight is distributed evenly across the 6 wheels)
-    weight_per_wheel = [total_weight / 6] * 6
+    weight_per_wheel = np.full(6, total_weight / 6)
 
-    return TrainLoad(total_weight=total_weight, weight_per_wheel=weight_per_wheel, base_positions=base_positions, train_position=train_position)
+    return TrainLoad(total_weight=total_weight, weight_per_wheel=weight_per_wheel, base_positions=_BASE_POSITIONS, train_position=train_position)
 
 def get_train_loads_2(first_pass=False):
     """
@@ -93,20 +116,19 @@ def get_train_loads_2(first_pass=False):
     train_position = get_train_position()
     total_weight = get_train_weight()
 
-    base_positions = [52, 176, 164, 176, 164, 176]
-
     if first_pass:
         freight_mid = total_weight / 3.35
         freight_end = freight_mid
     else:
         freight_mid = total_weight / 3.45 # this is the freight car with the least load
         freight_end = freight_mid * 1.1
-        
+
     locomotive = freight_end * 1.35
 
-    weight_per_wheel = [freight_end/2, freight_end/2, freight_mid/2, freight_mid/2, locomotive/2, locomotive/2]
+    # Two wheels per car, ordered as (end freight car, middle freight car, locomotive)
+    weight_per_wheel = np.array([freight_end, freight_end, freight_mid, freight_mid, locomotive, locomotive]) / 2
 
-    return TrainLoad(total_weight=total_weight, weight_per_wheel=weight_per_wheel, base_positions=base_positions, train_position=train_position)
+    return TrainLoad(total_weight=total_weight, weight_per_wheel=weight_per_wheel, base_positions=_BASE_POSITIONS, train_position=train_position)
 
 def get_glue_locations():
     """
@@ -155,26 +177,33 @@ def get_glue_locations():
     # Display existing glue connections in a table view
     st.write("Existing Glue Connections:")
     if cross_section.glue_connections:
-        glue_data = {
-            "Rectangle 1 ID": [],
-            "Rectangle 2 ID": [],
-            "Direction": [],
-            "Thickness (mm)": []
-        }
-        for connection in cross_section.glue_connections:
-            # Convert IDs to 1-based for display
-            rect1_id = connection['rect1'] + 1
-            rect2_id = connection['rect2'] + 1
-            glue_data["Rectangle 1 ID"].append(rect1_id)
-            glue_data["Rectangle 2 ID"].append(rect2_id)
-            glue_data["Direction"].append(connection['direction'])
-            glue_data["Thickness (mm)"].append(connection['thickness'])
-        
-        st.table(glue_data)
+        # The table is cached on the cross section and only rebuilt when a glue connection is added
+        st.dataframe(cross_section.glue_df(), hide_index=True)
     else:
         st.write("No glue connections available.")
     
-    save_geometry_to_file()
+    save_geometry_to_file(cross_section)
+
+@st.cache_data(max_entries=32, hash_funcs={TrainLoad: TrainLoad.cache_key})
+def _make_beam(length, supports, train_load):
+    """
+    Build the beam for the given inputs.
+
+    The beam is cached by Streamlit, so reruns with unchanged inputs skip building it again.
+    Its reactions and diagrams are calculated before it is cached, so each call returns a
+    fresh copy of the cached beam with them already in place.
+
+    Parameters:
+    length (float): The length of the beam.
+    supports (tuple): The supports of the beam.
+    train_load (TrainLoad): The train load applied to the beam.
+
+    Returns:
+    Beam: The beam for the given inputs.
+    """
+    beam = Beam(length, list(supports), train_load)
+    beam._frame_analysis  # calculated once here and stored with the cached beam
+    return beam
 
 def get_user_inputs():
     """
@@ -184,33 +213,42 @@ def get_user_inputs():
     - Beam supports
     - Load case (either evenly distributed or increasing load)
     - Train load based on the selected load case and pass type
+    The load case and pass type are chosen above a sidebar form and take effect immediately, so the
+    pass type is shown as soon as Case 2 is selected. The numeric inputs are placed in the form and
+    only take effect once "Apply" is pressed.
     Returns:
         tuple: A tuple containing:
             - length (float): The length of the beam.
-            - supports (list): A list of supports for the beam.
+            - supports (tuple): The supports of the beam.
             - beam (Beam): An instance of the Beam class initialized with the provided inputs.
     """
-    
-    st.sidebar.subheader("Beam Information")
 
-    length = get_beam_length()
-    supports = get_supports()
+    # The load case and pass type decide which inputs are needed, so they are outside the form
+    load_case = st.sidebar.selectbox("Select Load Case", options=["Case 1: evenly distributed", "Case 2: increasing load"])
+    if load_case != "Case 1: evenly distributed":
+        first_pass = st.sidebar.radio("Select Pass Type", options=["First Pass", "Subsequent Pass"], index=0)
 
-    diaphgrams = get_number_of_diaphragms()
+    # The numeric inputs are grouped in a form, so the app only reruns when they are applied
+    with st.sidebar.form("beam_inputs"):
+        st.subheader("Beam Information")
 
-    st.sidebar.subheader("Train Load Information")
+        length = get_beam_length()
+        supports = get_supports()
 
-    load_case = st.sidebar.selectbox("Select Load Case", options=["Case 1: evenly distributed", "Case 2: increasing load"])
+        diaphgrams = get_number_of_diaphragms()
 
-    if load_case == "Case 1: evenly distributed":
-        train_load = get_train_loads_1()
-    else:
-        first_pass = st.sidebar.radio("Select Pass Type", options=["First Pass", "Subsequent Pass"], index=0)
-        if first_pass == "First Pass":
-            train_load = get_train_loads_2(first_pass=True)
+        st.subheader("Train Load Information")
+
+        if load_case == "Case 1: evenly distributed":
+            train_load = get_train_loads_1()
         else:
-            train_load = get_train_loads_2()
+            if first_pass == "First Pass":
+                train_load = get_train_loads_2(first_pass=True)
+            else:
+                train_load = get_train_loads_2()
+
+        st.form_submit_button("Apply")
 
-    beam = Beam(length, supports, train_load)
+    beam = _make_beam(length, supports, train_load)
     
     return length, supports, beam, length/diaphgrams
\ No newline at end of file
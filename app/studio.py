@@ -1,14 +1,15 @@
 import streamlit as st
 from core import Rectangle
-from app.common import get_geometry, save_geometry_to_file
+from app.common import get_geometry, save_geometry_to_file, display_geometry_properties
 
 def display_geometry_input():
     """
     Displays the input fields for geometry parameters and handles the addition of rectangles 
     and rendering of the build in the Streamlit sidebar.
 
-    The function provides input fields for width, height, and position of a rectangle. 
-    It also includes buttons to add the rectangle to the geometry and to render the build.
+    The function provides input fields for width, height, and position of a rectangle in a form,
+    so the app only reruns once the rectangle is added. It also includes buttons to add the
+    rectangle to the geometry and to render the build.
 
     When the "Add Rectangle" button is pressed, the function validates the input and adds 
     the rectangle to the geometry if the input is valid. It displays a success message if 
@@ -26,14 +27,15 @@ def display_geometry_input():
 
     geometry = get_geometry()
 
-    # Input fields
-    width = st.sidebar.number_input("Width (mm)", min_value=1.0, value=100.0, key="width_input")
-    height = st.sidebar.number_input("Height (mm)", min_value=1.0, value=50.0, key="height_input")
-    position = st.sidebar.number_input("Position from bottom (mm)", value=0.0, key="position_input")
-    position_x = st.sidebar.number_input("Position from left (mm)", value=0.0, key="position_x_input")
+    # Input fields, grouped in a form so editing them does not rerun the app until a rectangle is added
+    with st.sidebar.form("rectangle_form"):
+        width = st.number_input("Width (mm)", min_value=1.0, value=100.0, key="width_input")
+        height = st.number_input("Height (mm)", min_value=1.0, value=50.0, key="height_input")
+        position = st.number_input("Position from bottom (mm)", value=0.0, key="position_input")
+        position_x = st.number_input("Position from left (mm)", value=0.0, key="position_x_input")
 
-    # Add and Render Buttons
-    add_rectangle = st.sidebar.button("Add Rectangle")
+        # Add and Render Buttons
+        add_rectangle = st.form_submit_button("Add Rectangle")
     render_build = st.sidebar.button("Render Build")
 
     if add_rectangle:
@@ -44,18 +46,9 @@ def display_geometry_input():
             st.sidebar.warning("Invalid input.")
 
     if render_build and geometry.rectangles:
-        total_area = geometry.calculate_total_area()
-        centroid_y = geometry.calculate_centroid()
-        centroid_x = geometry.calculate_centroid_x()
-        moment_of_inertia = geometry.calculate_moment_of_inertia()
-
-        st.subheader("Cross-Section Geometry")
-        st.write(f"Total Area: {total_area} mm²")
-        st.write(f"Centroid Position (Y): {centroid_y} mm")
-        st.write(f"Centroid Position (X): {centroid_x} mm")
-        st.write(f"Total Moment of Inertia: {moment_of_inertia} mm⁴")
+        display_geometry_properties(geometry)
     elif render_build:
         st.warning("Add rectangles before rendering.")
 
-    save_geometry_to_file()
+    save_geometry_to_file(geometry)
 
@@ -6,6 +6,7 @@ It imports the following classes:
 - TrainLoad: Represents a train load applied to the beam.
 - CrossSection: Represents the cross-sectional geometry of the beam.
 - Rectangle: Represents a rectangular cross-section.
+- RECT_DTYPE: NumPy structured dtype used to store rectangles as an array.
 
 The `__all__` list defines the public interface of this module, specifying
 the classes that will be available when the module is imported.
@@ -15,9 +16,10 @@ Attributes:
     TrainLoad (class): Represents a train load applied to the beam.
     CrossSection (class): Represents the cross-sectional geometry of the beam.
     Rectangle (class): Represents a rectangular cross-section.
+    RECT_DTYPE (np.dtype): NumPy structured dtype used to store rectangles as an array.
 """
 from .beam import Beam
 from .loads import TrainLoad
-from .geometry import CrossSection, Rectangle
+from .geometry import CrossSection, Rectangle, RECT_DTYPE
 
-__all__ = ["Beam", "TrainLoad", "CrossSection", "Rectangle"]
\ No newline at end of file
+__all__ = ["Beam", "TrainLoad", "CrossSection", "Rectangle", "RECT_DTYPE"]
\ No newline at end of file
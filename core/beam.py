@@ -1,9 +1,390 @@
-import matplotlib.pyplot as plt
+import functools
+import warnings
+from matplotlib.figure import Figure
 import streamlit as st
 import numpy as np
 
 from config import *
 
+def _sfd_bmd_kernel(x, positions, weights, length):
+    """
+    Calculate the reactions, shear forces and bending moments of a simply supported beam under point loads.
+
+    The shear forces are looked up from the running shear force after each load with a binary search,
+    and the moments of the loads are applied one after the other over the whole grid of positions
+    at once. For loads listed from left to right, like the wheels of a train, the results match
+    evaluating every position separately.
+
+    Parameters:
+    x (np.ndarray): The positions along the beam to evaluate.
+    positions (np.ndarray): The locations of the point loads.
+    weights (np.ndarray): The magnitudes of the point loads.
+    length (float): The length of the beam.
+
+    Returns:
+    tuple: The reactions at A and B, and the shear forces and bending moments at each position in x.
+    """
+    # Reactions from the total load and the moment about A
+    total_load = 0.0
+    sum_moments_A = 0.0
+    for i in range(positions.shape[0]):
+        total_load += weights[i]
+        sum_moments_A += weights[i] * positions[i]
+    RB = sum_moments_A / length
+    RA = total_load - RB
+
+    # The shear force is a step function: sort the loads by location, take the running shear force
+    # after each load, and look up the number of loads at or left of each position by binary search
+    order = np.argsort(positions, kind="mergesort")
+    shear_steps = np.empty(positions.shape[0] + 1)
+    shear_steps[0] = RA
+    for k in range(positions.shape[0]):
+        shear_steps[k + 1] = shear_steps[k] - weights[order[k]]
+    shear_forces = shear_steps[np.searchsorted(positions[order], x, side="right")]
+
+    # Subtract the moment of each load from the positions to its right or at the load itself
+    bending_moments = RA * x
+    for i in range(positions.shape[0]):
+        loaded = x >= positions[i]
+        bending_moments -= np.where(loaded, weights[i] * (x - positions[i]), 0.0)
+
+    return RA, RB, shear_forces, bending_moments
+
+def _round_to_tenth(values):
+    """
+    Round an array to one decimal and return it as a list of floats.
+
+    The values are rounded in one vectorized pass, giving the same results as calling Python's
+    round(value, 1) on each of them. Scaling by 10 before rounding can only go the other way for
+    values within rounding error of a halfway point, so those few are rounded with Python's round.
+
+    Parameters:
+    values (np.ndarray): The values to round.
+
+    Returns:
+    list: The rounded values.
+    """
+    return _rounded_to_tenth(values).tolist()
+
+def _rounded_to_tenth(values):
+    """Helper function for `_round_to_tenth` that returns the rounded values as an array."""
+    scaled = values * 10
+    rounded = np.rint(scaled) / 10
+    near_half = np.abs(np.abs(np.modf(scaled)[0]) - 0.5) <= 1e-9 * np.maximum(1.0, np.abs(scaled))
+    for i in np.flatnonzero(near_half).tolist():
+        rounded.flat[i] = round(float(values.flat[i]), 1)
+    return rounded
+
+def _sweep_envelopes(x, positions, weights, length, block_size=256):
+    """
+    Calculate the shear force and bending moment envelopes of a train moving across the beam.
+
+    Every train position is evaluated over the whole grid of positions at once by broadcasting
+    a (train positions, beam positions) array, in blocks of train positions to bound the memory
+    use. The arithmetic for each element is the same as in `_sfd_bmd_kernel`, so the envelopes
+    match running the kernel for each train position separately.
+
+    Parameters:
+    x (np.ndarray): The positions along the beam to evaluate.
+    positions (np.ndarray): The wheel locations, one row per train position.
+    weights (np.ndarray): The wheel loads, one row per train position.
+    length (float): The length of the beam.
+    block_size (int, optional): The number of train positions evaluated at once. Default is 256.
+
+    Returns:
+    tuple: The maximum shear force, minimum shear force and maximum bending moment at each position in x.
+    """
+    max_shear = np.full(x.shape[0], -np.inf)
+    min_shear = np.full(x.shape[0], np.inf)
+    max_moment = np.full(x.shape[0], -np.inf)
+
+    for shear_forces, bending_moments in _sweep_blocks(x, positions, weights, length, block_size):
+        np.maximum(max_shear, shear_forces.max(axis=0), out=max_shear)
+        np.minimum(min_shear, shear_forces.min(axis=0), out=min_shear)
+        np.maximum(max_moment, bending_moments.max(axis=0), out=max_moment)
+
+    return max_shear, min_shear, max_moment
+
+def _sweep_blocks(x, positions, weights, length, block_size=256):
+    """
+    Calculate the shear forces and bending moments of every train position of a sweep, a block at a time.
+
+    The arithmetic for each element is the same as in `_sfd_bmd_kernel`. The blocks are written
+    into buffers that are reused for the next block, so each block must be consumed before the next
+    one is requested.
+
+    Parameters:
+    x (np.ndarray): The positions along the beam to evaluate.
+    positions (np.ndarray): The wheel locations, one row per train position.
+    weights (np.ndarray): The wheel loads, one row per train position.
+    length (float): The length of the beam.
+    block_size (int, optional): The number of train positions evaluated at once. Default is 256.
+
+    Yields:
+    tuple: The shear forces and bending moments of a block, as (train positions, beam positions) arrays.
+    """
+    # Buffers for one block, allocated once and overwritten in place for every block
+    block_shape = (min(block_size, positions.shape[0]), x.shape[0])
+    shear_buffer = np.empty(block_shape)
+    moment_buffer = np.empty(block_shape)
+    wheel_moment_buffer = np.empty(block_shape)
+    loaded_buffer = np.empty(block_shape, dtype=bool)
+
+    for start in range(0, positions.shape[0], block_size):
+        block_positions = positions[start:start + block_size]
+        block_weights = weights[start:start + block_size]
+        rows = block_positions.shape[0]
+        shear_forces = shear_buffer[:rows]
+        bending_moments = moment_buffer[:rows]
+        wheel_moments = wheel_moment_buffer[:rows]
+        loaded = loaded_buffer[:rows]
+
+        # Reactions of every train position in the block
+        total_load = np.zeros(rows)
+        sum_moments_A = np.zeros(rows)
+        for i in range(block_positions.shape[1]):
+            total_load += block_weights[:, i]
+            sum_moments_A += block_weights[:, i] * block_positions[:, i]
+        RB = sum_moments_A / length
+        RA = total_load - RB
+
+        shear_forces[...] = RA[:, None]
+        np.multiply(RA[:, None], x, out=bending_moments)
+
+        # Subtract each wheel from the positions to its right or at the wheel itself, the positions
+        # left of the wheel are skipped rather than subtracting 0, which leaves them unchanged
+        for i in range(block_positions.shape[1]):
+            wheel_position = block_positions[:, i, None]
+            wheel_weight = block_weights[:, i, None]
+            np.greater_equal(x, wheel_position, out=loaded)
+            np.subtract(shear_forces, wheel_weight, out=shear_forces, where=loaded)
+            np.subtract(x, wheel_position, out=wheel_moments)
+            np.multiply(wheel_weight, wheel_moments, out=wheel_moments)
+            np.subtract(bending_moments, wheel_moments, out=bending_moments, where=loaded)
+
+        yield shear_forces, bending_moments
+
+def _sweep_arrays(start, weight_per_wheel, direction, num_steps, bridge_length):
+    """
+    Build the wheel locations and loads at every step of a train sweep, as two (steps, wheels) arrays.
+
+    The train moves 1 mm per step in the given direction. Wheels that are off the bridge carry no load.
+
+    Parameters:
+    start (np.ndarray): The wheel locations at the start of the sweep.
+    weight_per_wheel (np.ndarray): The weight carried by each wheel.
+    direction (int): 1 to move the train to the right, -1 to move it to the left.
+    num_steps (int): The number of train positions in the sweep.
+    bridge_length (float): The length of the bridge.
+
+    Returns:
+    tuple: The wheel locations and the wheel loads, one row per train position.
+    """
+    offsets = np.arange(num_steps, dtype=np.float64)
+    if direction < 0:
+        offsets = -offsets
+    wheel_positions = start + offsets[:, None]
+
+    on_bridge = (wheel_positions >= 0) & (wheel_positions <= bridge_length)
+    wheel_weights = np.where(on_bridge, weight_per_wheel, 0)
+    return wheel_positions, wheel_weights
+
+def _sweep_end(start, weight_per_wheel, direction, num_steps, bridge_length):
+    """
+    Return the wheel locations and loads at the last step of a train sweep, the same values as the
+    last rows of `_sweep_arrays`, without building the arrays for the whole sweep.
+
+    Parameters:
+    start (np.ndarray): The wheel locations at the start of the sweep.
+    weight_per_wheel (np.ndarray): The weight carried by each wheel.
+    direction (int): 1 to move the train to the right, -1 to move it to the left.
+    num_steps (int): The number of train positions in the sweep, at least 1.
+    bridge_length (float): The length of the bridge.
+
+    Returns:
+    tuple: The wheel locations and the wheel loads at the last train position.
+    """
+    wheel_positions = start + float(direction * (num_steps - 1))
+
+    on_bridge = (wheel_positions >= 0) & (wheel_positions <= bridge_length)
+    wheel_weights = np.where(on_bridge, weight_per_wheel, 0)
+    return wheel_positions, wheel_weights
+
+@functools.lru_cache(maxsize=32)
+def _cached_envelopes(length, start, weight_per_wheel, direction, num_steps, bridge_length):
+    """
+    Calculate the rounded shear force and bending moment envelopes of a train sweep.
+
+    A sweep only depends on the beam, the train's starting wheel locations and weights and the
+    direction, so generating the envelopes again for the same inputs, as the app does on every
+    "Generate", reuses the previous result.
+
+    Parameters:
+    length (float): The length of the beam.
+    start (tuple): The wheel locations at the start of the sweep.
+    weight_per_wheel (tuple): The weight carried by each wheel.
+    direction (int): 1 to move the train to the right, -1 to move it to the left.
+    num_steps (int): The number of train positions in the sweep.
+    bridge_length (float): The length of the bridge.
+
+    Returns:
+    tuple: The maximum shear force, minimum shear force and maximum bending moment envelopes, as read-only arrays.
+    """
+    wheel_positions, wheel_weights = _sweep_arrays(np.array(start), np.array(weight_per_wheel),
+                                                   direction, num_steps, bridge_length)
+    x = np.arange(int(length) + 1, dtype=np.float64)
+
+    # Rounding is monotonic, so rounding the extremes gives the same envelopes as taking the
+    # extremes of the rounded diagrams
+    envelopes = tuple(_rounded_to_tenth(envelope) for envelope in _sweep_envelopes(x, wheel_positions, wheel_weights, float(length)))
+    for envelope in envelopes:
+        envelope.setflags(write=False)  # shared by every caller of the cache, so it must never be modified in place
+    return envelopes
+
+def _sfd_bmd_figure(length, shear_forces, bending_moments):
+    """
+    Build the Shear Force Diagram (SFD) and Bending Moment Diagram (BMD) figure.
+
+    A new figure is built for every render, since matplotlib figures are not thread-safe and
+    must not be shared between sessions. The plotted diagrams are already cached on the beam.
+    The figure is created without pyplot so it is not kept open by its figure manager.
+
+    Parameters:
+    length (float): The length of the beam.
+    shear_forces (list): The shear forces at each point along the beam.
+    bending_moments (list): The bending moments at each point along the beam.
+
+    Returns:
+    Figure: The figure with the SFD and BMD subplots.
+    """
+    positions = np.arange(int(length) + 1)  # Positions along the beam, shared by both diagrams
+
+    # Create a figure with two subplots
+    fig = Figure(figsize=(10, 8))
+    ax1, ax2 = fig.subplots(2, 1)
+
+    # Plot Shear Force Diagram (SFD)
+    ax1.plot(positions, shear_forces, label='Shear Force')
+    ax1.set_title('Shear Force Diagram')
+    ax1.set_xlabel('Position along the beam (mm)')
+    ax1.set_ylabel('Shear Force (N)')
+    ax1.grid(True)
+    ax1.legend()
+
+    # Plot Bending Moment Diagram (BMD)
+    ax2.plot(positions, bending_moments, label='Bending Moment', color='r')
+    ax2.set_title('Bending Moment Diagram')
+    ax2.set_xlabel('Position along the beam (mm)')
+    ax2.set_ylabel('Bending Moment (Nmm)')
+    ax2.grid(True)
+    ax2.legend()
+
+    # Adjust layout with padding between plots
+    fig.tight_layout(pad=3.0)
+
+    return fig
+
+@functools.lru_cache(maxsize=32)
+def _cached_key_plots(length, start, weight_per_wheel, direction, num_steps, bridge_length):
+    """
+    Calculate the diagrams of a few key train positions of a sweep, at the start, middle and end of the beam.
+
+    Like `_cached_envelopes`, the key plots only depend on the sweep, so generating the same sweep
+    again reuses them.
+
+    Parameters:
+    length (float): The length of the beam.
+    start (tuple): The wheel locations at the start of the sweep.
+    weight_per_wheel (tuple): The weight carried by each wheel.
+    direction (int): 1 to move the train to the right, -1 to move it to the left.
+    num_steps (int): The number of train positions in the sweep.
+    bridge_length (float): The length of the bridge.
+
+    Returns:
+    tuple: The rounded shear forces, rounded bending moments and leading wheel location of every key
+           plot, as tuples so they are never modified in place.
+    """
+    all_positions = np.arange(int(length) + 1, dtype=np.float64)  # Full beam positions
+    wheel_positions, wheel_weights = _sweep_arrays(np.array(start), np.array(weight_per_wheel),
+                                                   direction, num_steps, bridge_length)
+
+    # Store results for only a few key plots
+    shear_force_plots = []
+    bending_moment_plots = []
+    key_plot_indices = []
+    step_size = length // 3  # Divide into 3 parts: start, middle, end
+    leading_wheel = wheel_positions[:, 0]
+    first_step = 0
+    for target in (0, step_size, 2 * step_size):
+        # First step after the previous key plot where the leading wheel is within 1 mm of the target
+        matches = np.flatnonzero(np.abs(leading_wheel[first_step:] - target) < 1)
+        if not len(matches):
+            break
+        step = first_step + int(matches[0])
+        _, _, shear_forces, bending_moments = _sfd_bmd_kernel(all_positions, wheel_positions[step], wheel_weights[step], length)
+        shear_force_plots.append(tuple(_round_to_tenth(shear_forces)))
+        bending_moment_plots.append(tuple(_round_to_tenth(bending_moments)))
+        key_plot_indices.append(float(leading_wheel[step]))
+        first_step = step + 1
+    return tuple(shear_force_plots), tuple(bending_moment_plots), tuple(key_plot_indices)
+
+def _sfe_bme_figure(length, key_plots, envelopes, extrema):
+    """
+    Build the Shear Force Envelope (SFE) and Bending Moment Envelope (BME) figure of a train sweep.
+
+    The figure shows the envelopes, their extrema and the diagrams of a few key train positions at the
+    start, middle and end of the beam. A new figure is built for every render, since matplotlib figures
+    are not thread-safe and must not be shared between sessions; the plotted arrays are cached instead.
+
+    Parameters:
+    length (float): The length of the beam.
+    key_plots (tuple): The shear forces, bending moments and leading wheel location of the key plots.
+    envelopes (tuple): The maximum shear force, minimum shear force and maximum bending moment envelopes.
+    extrema (tuple): The (location, value) of the maximum and minimum shear force and bending moment.
+
+    Returns:
+    Figure: The figure with the SFE and BME subplots.
+    """
+    all_positions = np.arange(int(length) + 1, dtype=np.float64)  # Full beam positions
+    shear_force_plots, bending_moment_plots, key_plot_indices = key_plots
+    shear_forces_max_envelope, shear_forces_min_envelope, bending_moments_envelope = envelopes
+    (max_shear_location, max_shear_value), (min_shear_location, min_shear_value), \
+        (max_bending_location, max_bending_value), (min_bending_location, min_bending_value) = extrema
+
+    # Plotting
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots(2, 1)
+
+    # Plot only selected SFD and BMD
+    for i, (sf, bm) in enumerate(zip(shear_force_plots, bending_moment_plots)):
+        ax[0].plot(all_positions, sf, label=f"Train Pos {key_plot_indices[i]}")
+        ax[1].plot(all_positions, bm, label=f"Train Pos {key_plot_indices[i]}")
+
+    # Plot the envelopes
+    ax[0].plot(all_positions, shear_forces_max_envelope, 'r-', linewidth=2, label="SF Envelope (Max)")
+    ax[0].plot(all_positions, shear_forces_min_envelope, 'r-', linewidth=2, label="SF Envelope (Min)")
+    ax[1].plot(all_positions, bending_moments_envelope, 'b-', linewidth=2, label="BM Envelope")
+
+    # Highlight extrema
+    ax[0].scatter([max_shear_location, min_shear_location],
+                [max_shear_value, min_shear_value], color='red', zorder=5, label="SF Extrema")
+    ax[1].scatter([max_bending_location, min_bending_location],
+                [max_bending_value, min_bending_value], color='blue', zorder=5, label="BM Extrema")
+
+    ax[0].set_xlabel("Beam Length")
+    ax[0].set_ylabel("Shear Force (SF)")
+    ax[0].legend()
+    ax[0].grid()
+
+    ax[1].set_xlabel("Beam Length")
+    ax[1].set_ylabel("Bending Moment (BM)")
+    ax[1].legend()
+    ax[1].grid()
+
+    fig.tight_layout()
+
+    return fig
+
 class Beam:
     """
     A class to represent a beam and perform structural analysis.
@@ -14,22 +395,70 @@ class Beam:
         self.Load = loads     # TrainLoad object
         self.Load.bridge_length = length
         self.loads = loads.get_loads()   # List of loads with (location, magnitude)
+        self._frame_load_arrays = loads.get_loads_arrays()  # The same loads as (locations, magnitudes) arrays
         self.cross_section = cross_section  # CrossSection object
-
-        # Calculate reaction forces based on applied loads and support locations
-        self.reaction_forces = self.calculate_reactions()
-        self.shear_forces, self.bending_moments = self.calculate_sfd_bmd()
-        self.max_shear_force_frame = max(self.shear_forces)
-        self.max_bending_moment_frame = max(self.bending_moments)
+        self._x = np.arange(int(length) + 1, dtype=np.float64)  # Positions at which the SFD and BMD are evaluated
+        # The reactions and diagrams are calculated on first use, for the loads applied at construction
         self.shear_forces_max_envelope = []
         self.shear_forces_min_envelope = []
         self.bending_moments_envelope = []
         self.shear_forces_envelope = []
         self.shear_stress = {}
+        self.glue_shear_stress = {}  # Shear stress of each glue line keyed by (rect1, rect2, direction)
         self.max_shear_force = None
         self.max_bending_moment = None
         self.FOS = {}
 
+    @functools.cached_property
+    def _frame_analysis(self):
+        """
+        The reaction forces, shear forces and bending moments for the loads applied at construction.
+
+        They are calculated in a single pass over the loads the first time any of them is used, so
+        constructing a beam does not evaluate the diagrams until an analysis needs them.
+        """
+        RA, RB, shear_forces, bending_moments = _sfd_bmd_kernel(self._x, *self._frame_load_arrays, float(self.length))
+        return {'A': float(RA), 'B': float(RB)}, _round_to_tenth(shear_forces), _round_to_tenth(bending_moments)
+
+    @functools.cached_property
+    def reaction_forces(self):
+        """The reactions at supports A and B, as a dictionary keyed by 'A' and 'B'."""
+        return self._frame_analysis[0]
+
+    @functools.cached_property
+    def shear_forces(self):
+        """The shear forces at each point along the beam."""
+        return self._frame_analysis[1]
+
+    @functools.cached_property
+    def bending_moments(self):
+        """The bending moments at each point along the beam."""
+        return self._frame_analysis[2]
+
+    @functools.cached_property
+    def _shear_forces_np(self):
+        """The shear forces as a read-only array, shared by the calculations that need them vectorized."""
+        shear_forces = np.asarray(self.shear_forces, dtype=np.float64)
+        shear_forces.setflags(write=False)
+        return shear_forces
+
+    @functools.cached_property
+    def _bending_moments_np(self):
+        """The bending moments as a read-only array, shared by the calculations that need them vectorized."""
+        bending_moments = np.asarray(self.bending_moments, dtype=np.float64)
+        bending_moments.setflags(write=False)
+        return bending_moments
+
+    @functools.cached_property
+    def max_shear_force_frame(self):
+        """The maximum shear force along the beam."""
+        return max(self.shear_forces)
+
+    @functools.cached_property
+    def max_bending_moment_frame(self):
+        """The maximum bending moment along the beam."""
+        return max(self.bending_moments)
+
     def calculate_reactions(self):
         """
         Calculate the reactions at supports A and B for a simply supported beam.
@@ -60,46 +489,27 @@ class Beam:
         Calculate the Shear Force Diagram (SFD) and Bending Moment Diagram (BMD) for the beam.
 
         This method computes the shear forces and bending moments at discrete points along the length of the beam.
-        It first calculates the reactions at the supports and then iterates over each point along the beam to determine
-        the shear force and bending moment at that point.
+        The reactions, shear forces and bending moments are calculated for all points at once by `_sfd_bmd_kernel`,
+        and then rounded to one decimal.
 
         Returns:
             tuple: A tuple containing two lists:
                 - shear_forces (list of float): The shear forces at each point along the beam.
                 - bending_moments (list of float): The bending moments at each point along the beam.
         """
-        # Initialize lists for shear force and bending moment
-        shear_forces = []
-        bending_moments = []
+        return self._sfd_bmd_for(*self._load_arrays(self.loads))
 
-        # Calculate reactions first
-        reactions = self.calculate_reactions()
-
-        # Loop over each point along the length of the beam
-        for x in range(0, int(self.length) + 1):  # From 0 to length of the beam (inclusive)
-            # Start by calculating the shear force at the current position
-            shear_force = reactions['A']  # Start with the reaction at A
-
-            # Subtract loads that are to the left of the current position
-            for load_pos, load_mag in self.loads:
-                if load_pos <= x:  # If the load is to the left or at the current position
-                    shear_force -= load_mag  # Subtract the load (since it acts downward)
-
-            # Add the shear force to the list
-            shear_forces.append(round(shear_force,1))
-
-            # Now calculate the bending moment at the current position
-            bending_moment = reactions['A'] * x  # Moment due to reaction at A
-
-            # Subtract moments caused by loads to the left of the current position
-            for load_pos, load_mag in self.loads:
-                if load_pos <= x:  # Only consider loads to the left or at the current position
-                    bending_moment -= load_mag * (x - load_pos)  # Moment = Load * Distance from load
+    @staticmethod
+    def _load_arrays(loads):
+        """Helper function that returns the locations and magnitudes of (location, magnitude) loads as two arrays."""
+        loads = np.asarray(loads, dtype=np.float64).reshape(-1, 2)
+        return loads[:, 0], loads[:, 1]
 
-            # Add the bending moment to the list
-            bending_moments.append(round(bending_moment,1))
+    def _sfd_bmd_for(self, positions, weights):
+        """Helper function that returns the rounded shear forces and bending moments for the given point loads."""
+        _, _, shear_forces, bending_moments = _sfd_bmd_kernel(self._x, positions, weights, float(self.length))
 
-        return shear_forces, bending_moments
+        return _round_to_tenth(shear_forces), _round_to_tenth(bending_moments)
     
     def plot_sfd_bmd(self):
         """
@@ -110,6 +520,7 @@ class Beam:
         - The second subplot displays the Bending Moment Diagram (BMD).
 
         The diagrams are plotted using the shear forces and bending moments calculated along the length of the beam.
+        The diagrams are calculated once per beam, the figure itself is built again for every render.
 
         The plots are displayed using Streamlit.
 
@@ -119,28 +530,7 @@ class Beam:
         Returns:
         None
         """
-
-        # Create a figure with two subplots
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
-
-        # Plot Shear Force Diagram (SFD)
-        ax1.plot(range(0, int(self.length) + 1), self.shear_forces, label='Shear Force')
-        ax1.set_title('Shear Force Diagram')
-        ax1.set_xlabel('Position along the beam (mm)')
-        ax1.set_ylabel('Shear Force (N)')
-        ax1.grid(True)
-        ax1.legend()
-
-        # Plot Bending Moment Diagram (BMD)
-        ax2.plot(range(0, int(self.length) + 1), self.bending_moments, label='Bending Moment', color='r')
-        ax2.set_title('Bending Moment Diagram')
-        ax2.set_xlabel('Position along the beam (mm)')
-        ax2.set_ylabel('Bending Moment (Nmm)')
-        ax2.grid(True)
-        ax2.legend()
-
-        # Adjust layout with padding between plots
-        plt.tight_layout(pad=3.0)
+        fig = _sfd_bmd_figure(self.length, self.shear_forces, self.bending_moments)
 
         # Display the plot using Streamlit
         st.pyplot(fig)
@@ -175,13 +565,49 @@ class Beam:
     @staticmethod
     def _find_extrema(data):
         """Helper function to find max positive and min negative values with indices."""
-        max_pos = max(((idx - TRAIN_LENGTH, val) 
-                       for idx, val in enumerate(data) if val > 0), default=(None, 0), key=lambda x: x[1])
-        min_neg = min(((idx - TRAIN_LENGTH, val) 
-                       for idx, val in enumerate(data) if val < 0), default=(None, 0), key=lambda x: x[1])
-        
+        data = np.asarray(data, dtype=np.float64)
+        max_pos = min_neg = (None, 0)
+
+        # Mask out the values of the other sign, argmax/argmin return the first extremum like max/min
+        positive = data > 0
+        if positive.any():
+            idx = int(np.argmax(np.where(positive, data, -np.inf)))
+            max_pos = (idx - TRAIN_LENGTH, float(data[idx]))
+        negative = data < 0
+        if negative.any():
+            idx = int(np.argmin(np.where(negative, data, np.inf)))
+            min_neg = (idx - TRAIN_LENGTH, float(data[idx]))
+
         return max_pos, min_neg
     
+    def _sweep_loads(self, left):
+        """
+        Helper function that places the train at its starting position and returns the wheel
+        locations and loads at every step of a sweep across the beam, as two (steps, wheels) arrays.
+
+        The train moves 1 mm per step until it has left the bridge. Wheels that are off the bridge carry no load.
+        """
+        start, weight_per_wheel, direction, num_steps = self._sweep_start(left)
+        return _sweep_arrays(start, weight_per_wheel, direction, num_steps, self.Load.bridge_length)
+
+    def _sweep_start(self, left):
+        """
+        Helper function that places the train at its starting position and returns the starting wheel
+        locations, the wheel weights, the direction and the number of steps of a sweep across the beam.
+        """
+        # Set the train's starting position
+        if left:
+            self.Load.set_train_left()
+        else:
+            self.Load.set_train_right()
+        start = self.Load.wheel_positions
+
+        if left:
+            num_steps = int(np.floor(self.length - start[0])) + 1 if start[0] <= self.length else 0
+        else:
+            num_steps = int(np.floor(start[-1])) + 1 if start[-1] >= 0 else 0
+        return start, np.asarray(self.Load.weight_per_wheel, dtype=np.float64), 1 if left else -1, num_steps
+
     def generate_sfe_bme(self, left=True):
         """
         Generates and plots Shear Force and Bending Moment Diagrams for selected train positions,
@@ -200,105 +626,46 @@ class Beam:
         self.shear_forces_envelope = []
         self.bending_moments_envelope = []
 
-        # Set the train's starting position
-        if left:
-            self.Load.set_train_left()
-        else:
-            self.Load.set_train_right()
-
-        all_positions = range(int(self.length + 1))  # Full beam positions
-        shear_force_plots = []
-        bending_moment_plots = []
-
-        # Store indices for only a few key plots
-        key_plot_indices = []
-        step_size = self.length // 3  # Divide into 3 parts: start, middle, end
-
-        while (left and self.Load.wheel_positions[0] <= self.length) or (not left and self.Load.wheel_positions[-1] >= 0):
-            # Update the loads for the current train position
-            self.loads = self.Load.get_loads()
-
-            # Calculate shear forces and bending moments
-            shear_forces, bending_moments = self.calculate_sfd_bmd()
-
-            # Update the envelopes
-            if not self.shear_forces_min_envelope or not self.shear_forces_max_envelope:
-                self.shear_forces_max_envelope = shear_forces
-                self.shear_forces_min_envelope = shear_forces
-                self.bending_moments_envelope = bending_moments
-            else:
-                self.shear_forces_max_envelope = [
-                    max(env, sf) for env, sf in zip(self.shear_forces_max_envelope, shear_forces)
-                ]
-                self.shear_forces_min_envelope = [
-                    min(env, sf) for env, sf in zip(self.shear_forces_min_envelope, shear_forces)
-                ]
-                self.bending_moments_envelope = [
-                    max(env, bm) for env, bm in zip(self.bending_moments_envelope, bending_moments)
-                ]
-
-            # Add results for key positions
-            current_index = self.Load.wheel_positions[0]
-            if len(key_plot_indices) < 3 and abs(current_index - (len(key_plot_indices) * step_size)) < 1:
-                shear_force_plots.append(shear_forces)
-                bending_moment_plots.append(bending_moments)
-                key_plot_indices.append(current_index)
-
-            # Move the train incrementally
-            if left:
-                self.Load.update_load_positions(direction=1)
-            else:
-                self.Load.update_load_positions(direction=-1)
-
-        # Find extrema with locations
-        max_shear_value = max(self.shear_forces_max_envelope)
-        min_shear_value = min(self.shear_forces_min_envelope)
-        max_shear_location = self.shear_forces_max_envelope.index(max_shear_value)
-        min_shear_location = self.shear_forces_min_envelope.index(min_shear_value)
-
-        max_bending_value = max(self.bending_moments_envelope, key=abs)
-        min_bending_value = min(self.bending_moments_envelope, key=abs)
-        max_bending_location = self.bending_moments_envelope.index(max_bending_value)
-        min_bending_location = self.bending_moments_envelope.index(min_bending_value)
-
-        # Plotting
-        fig, ax = plt.subplots(2, 1, figsize=(12, 8))
-
-        # Plot only selected SFD and BMD
-        for i, (sf, bm) in enumerate(zip(shear_force_plots, bending_moment_plots)):
-            ax[0].plot(all_positions, sf, label=f"Train Pos {key_plot_indices[i]}")
-            ax[1].plot(all_positions, bm, label=f"Train Pos {key_plot_indices[i]}")
-
-        # Plot the envelopes
-        ax[0].plot(all_positions, self.shear_forces_max_envelope, 'r-', linewidth=2, label="SF Envelope (Max)")
-        ax[0].plot(all_positions, self.shear_forces_min_envelope, 'r-', linewidth=2, label="SF Envelope (Min)")
-        ax[1].plot(all_positions, self.bending_moments_envelope, 'b-', linewidth=2, label="BM Envelope")
-
-        # Highlight extrema
-        ax[0].scatter([max_shear_location, min_shear_location],
-                    [max_shear_value, min_shear_value], color='red', zorder=5, label="SF Extrema")
-        ax[1].scatter([max_bending_location, min_bending_location],
-                    [max_bending_value, min_bending_value], color='blue', zorder=5, label="BM Extrema")
-
-        ax[0].set_xlabel("Beam Length")
-        ax[0].set_ylabel("Shear Force (SF)")
-        ax[0].legend()
-        ax[0].grid()
-
-        ax[1].set_xlabel("Beam Length")
-        ax[1].set_ylabel("Bending Moment (BM)")
-        ax[1].legend()
-        ax[1].grid()
-
-        plt.tight_layout()
-        st.pyplot(fig)
-
-        return (
+        start, weight_per_wheel, direction, num_steps = self._sweep_start(left)
+
+        # Calculate the envelopes over all train positions at once, or reuse them from an identical sweep
+        sweep = (float(self.length), tuple(start.tolist()), tuple(weight_per_wheel.tolist()),
+                 direction, num_steps, float(self.Load.bridge_length))
+        max_shear, min_shear, max_moment = _cached_envelopes(*sweep)
+        self.shear_forces_max_envelope = max_shear.tolist()
+        self.shear_forces_min_envelope = min_shear.tolist()
+        self.bending_moments_envelope = max_moment.tolist()
+
+        # Leave the train and the loads where the sweep ended, without building the whole sweep
+        if num_steps:
+            wheel_positions, wheel_weights = _sweep_end(start, weight_per_wheel, direction, num_steps, self.Load.bridge_length)
+            self.loads = list(zip(wheel_positions.tolist(), wheel_weights.tolist()))
+        self.Load.update_load_positions(shift_distance=num_steps, direction=direction)
+
+        # Find extrema with locations, argmax/argmin return the first extremum in a single pass
+        max_shear_location = int(np.argmax(max_shear))
+        min_shear_location = int(np.argmin(min_shear))
+        max_shear_value = self.shear_forces_max_envelope[max_shear_location]
+        min_shear_value = self.shear_forces_min_envelope[min_shear_location]
+
+        abs_moment = np.abs(max_moment)
+        max_bending_location = int(abs_moment.argmax())
+        min_bending_location = int(abs_moment.argmin())
+        max_bending_value = self.bending_moments_envelope[max_bending_location]
+        min_bending_value = self.bending_moments_envelope[min_bending_location]
+
+        extrema = (
             (max_shear_location, max_shear_value),
             (min_shear_location, min_shear_value),
             (max_bending_location, max_bending_value),
             (min_bending_location, min_bending_value),
         )
+
+        # The key plots only depend on the sweep, so they are cached on the same inputs as the envelopes
+        envelopes = (self.shear_forces_max_envelope, self.shear_forces_min_envelope, self.bending_moments_envelope)
+        st.pyplot(_sfe_bme_figure(self.length, _cached_key_plots(*sweep), envelopes, extrema))
+
+        return extrema
     
     def generate_loading_characteristic(self, left=True):
         """
@@ -316,30 +683,21 @@ class Beam:
                 - max_negative_bending (float): The maximum negative bending moment encountered.
         """
 
-        # Move train to the extreme left
-        if left:
-            self.Load.set_train_left()
-        else: 
-            self.Load.set_train_right()
-
-        # Iteratively move train across the bridge
-        while (left and self.Load.wheel_positions[0] <= self.length) or (not left and self.Load.wheel_positions[-1] >= 0):
-            # Update the beam's loads based on the train's current position
-            self.loads = self.Load.get_loads()
+        wheel_positions, wheel_weights = self._sweep_loads(left)
 
-            # Calculate shear forces at all positions
-            shear_forces, bending_moments = self.calculate_sfd_bmd()
+        # Calculate the diagrams of a whole block of train positions at once
+        for shear_forces, bending_moments in _sweep_blocks(self._x, wheel_positions, wheel_weights, float(self.length)):
+            shear_forces, bending_moments = _rounded_to_tenth(shear_forces), _rounded_to_tenth(bending_moments)
+            rows = np.arange(shear_forces.shape[0])
 
-            # Update the shear force envelope with the maximum at each position
-            self.shear_forces_envelope.append(max(shear_forces, key=abs))
-            self.bending_moments_envelope.append(max(bending_moments, key=abs))
+            # Update the envelopes with the value of largest magnitude, argmax returns the first one like max(key=abs)
+            self.shear_forces_envelope.extend(shear_forces[rows, np.abs(shear_forces).argmax(axis=1)].tolist())
+            self.bending_moments_envelope.extend(bending_moments[rows, np.abs(bending_moments).argmax(axis=1)].tolist())
 
-            if left:
-                # Move train to the right incrementally
-                self.Load.update_load_positions(direction=1)
-            else:
-                # Move train to the left incrementally
-                self.Load.update_load_positions(direction=-1)
+        # Leave the train and the loads where the sweep ended
+        if len(wheel_positions):
+            self.loads = list(zip(wheel_positions[-1].tolist(), wheel_weights[-1].tolist()))
+        self.Load.update_load_positions(shift_distance=len(wheel_positions), direction=1 if left else -1)
 
         # Calculate shear force and bending moment extrema
         max_positive_shear, max_negative_shear = self._find_extrema(self.shear_forces_envelope)
@@ -375,7 +733,7 @@ class Beam:
             ValueError: If the length of the envelope data does not match the expected x-axis range.
         """
         # Calculate the x-axis range: train can extend from -train_length to bridge_length
-        x_range = list(range(-int(TRAIN_LENGTH), int(self.length) + 1))
+        x_range = np.arange(-int(TRAIN_LENGTH), int(self.length) + 1)
 
         # Ensure the envelope data matches the extended range
         if len(self.shear_forces_envelope) != len(x_range):
@@ -383,7 +741,8 @@ class Beam:
             return
 
         # Create a figure with two subplots
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+        fig = Figure(figsize=(12, 10))
+        ax1, ax2 = fig.subplots(2, 1)
 
         # Plot Shear Force Envelope (SFE)
         ax1.plot(x_range, self.shear_forces_envelope, label='Shear Force Envelope', color='b')
@@ -404,7 +763,7 @@ class Beam:
         ax2.legend()
 
         # Adjust layout with padding between plots
-        plt.tight_layout(pad=3.0)
+        fig.tight_layout(pad=3.0)
 
         # Display the plot using Streamlit
         st.pyplot(fig)
@@ -425,27 +784,7 @@ class Beam:
             V = max(abs(self.max_shear_force[0]), abs(self.max_shear_force[1]))
 
         I = self.cross_section.I
-        Q = 0  # First moment of area
-        b = 0  # Width at the centroidal axis
-
-        for rectangle in self.cross_section.rectangles:
-            # Bottom position and top position of the rectangle
-            bottom = rectangle.position
-            top = rectangle.position + rectangle.height
-
-            # Rectangle intersects the centroid
-            if bottom <= self.cross_section.centroid <= top: 
-                b += rectangle.width  # Add the rectangle's width to b
-
-                # Area of the portion above/below the centroid
-                height_below = self.cross_section.centroid - bottom
-                area_below = height_below * rectangle.width
-
-                Q += area_below * abs(height_below/2 - self.cross_section.centroid)
-
-            elif top < self.cross_section.centroid:
-                # Rectangle is strictly below the centroid
-                Q += rectangle.area * abs(rectangle.centroid - self.cross_section.centroid)
+        Q, b = self.cross_section.calculate_centroid_first_moment()  # First moment of area and width at the centroidal axis
 
         # Ensure b is non-zero to avoid division errors
         if b == 0:
@@ -462,11 +801,12 @@ class Beam:
 
         return max_shear_stress, FOS_shear
     
-    @DeprecationWarning
     def calculate_glue_shear_combined(self):
         """
         Calculate the combined glue shear for all glue connections in the cross-section.
 
+        Deprecated: use `calculate_glue_shear`, which checks every glue connection on its own.
+
         This method iterates over the glue connections in the cross-section, combines
         connections between the same pairs of rectangles in the same direction, and
         then calculates the glue shear for each unique pair of rectangles.
@@ -481,6 +821,9 @@ class Beam:
         Returns:
             None
         """
+        warnings.warn("calculate_glue_shear_combined is deprecated, use calculate_glue_shear instead",
+                      DeprecationWarning, stacklevel=2)
+
         # Initialize a dictionary to store combined glue connections by (rect1, rect2, direction)
         combined_connections = {}
 
@@ -506,14 +849,19 @@ class Beam:
         """
         Calculate the shear stress in the glue connections of the beam's cross section.
 
-        This method iterates over all glue connections in the cross section and calculates
-        the shear stress for each pair of connected rectangles.
+        This method checks all glue connections in the cross section, then looks up the first
+        moment of area of every glue line at once, and calculates the shear stress for each pair
+        of connected rectangles.
 
         Returns:
             None
         """
-        for connection in self.cross_section.glue_connections:
-            self.calculate_glue_shear_pair(connection["rect1"], connection["rect2"], connection["direction"], connection["thickness"])
+        connections = self.cross_section.glue_connections
+        edges = [self._glue_edge(connection["rect1"], connection["rect2"], connection["direction"], connection["thickness"])
+                 for connection in connections]
+
+        for connection, Q in zip(connections, self.cross_section.calculate_glue_first_moments(edges)):
+            self._store_glue_shear(connection["rect1"], connection["rect2"], connection["direction"], connection["thickness"], Q)
 
     def calculate_glue_shear_pair(self, rect1_id, rect2_id, direction, thickness):
         """
@@ -530,22 +878,32 @@ class Beam:
                     the glue thickness is not greater than zero, or no common edge is found.
         NotImplementedError: If the vertical glue calculation is not implemented because it is not used in our design
         """
-        
-        if rect1_id < 0 or rect1_id >= len(self.cross_section.rectangles) or \
-        rect2_id < 0 or rect2_id >= len(self.cross_section.rectangles):
+        edge = self._glue_edge(rect1_id, rect2_id, direction, thickness)
+        Q = self.cross_section.calculate_glue_first_moments([edge])[0]
+
+        return self._store_glue_shear(rect1_id, rect2_id, direction, thickness, Q)
+
+    def _glue_edge(self, rect1_id, rect2_id, direction, thickness):
+        """Helper function that checks a glue connection and returns the height of its glue line."""
+        dims = self.cross_section.dimensions
+
+        if rect1_id < 0 or rect1_id >= len(dims) or \
+        rect2_id < 0 or rect2_id >= len(dims):
             raise ValueError("Invalid rectangle IDs provided.")
 
-        rect1 = self.cross_section.rectangles[rect1_id]
-        rect2 = self.cross_section.rectangles[rect2_id]
+        position = dims["position"]
+        height = dims["height"]
+        rect1_position, rect1_height = float(position[rect1_id]), float(height[rect1_id])
+        rect2_position, rect2_height = float(position[rect2_id]), float(height[rect2_id])
         
         edge = None
 
         # Check if the rectangles intersect horizontally or vertically
         if direction == "horizontal":
-            if rect1.position == rect2.position + rect2.height:
-                edge = rect1.position
-            elif rect2.position == rect1.position + rect1.height:
-                edge = rect2.position
+            if rect1_position == rect2_position + rect2_height:
+                edge = rect1_position
+            elif rect2_position == rect1_position + rect1_height:
+                edge = rect2_position
             else:
                 raise ValueError("Rectangles do not intersect horizontally.")
         elif direction == "vertical":
@@ -559,17 +917,10 @@ class Beam:
         if thickness <= 0:
             raise ValueError("Glue thickness must be greater than zero.")
 
-        # Calculate Q (first moment of area above/below the glue line)
-        Q = 0
-        for rectangle in self.cross_section.rectangles:
-            if direction == "horizontal" and \
-                ((self.cross_section.centroid < edge <= rectangle.position) or \
-                 (rectangle.position <= edge < self.cross_section.centroid)):
-                # Rectangle is above/below the glue line
-                Q += rectangle.area * abs(rectangle.centroid - self.cross_section.centroid)
-            elif direction == "vertical":
-                raise NotImplementedError("Vertical Glue has Not been Implemented")
+        return edge
 
+    def _store_glue_shear(self, rect1_id, rect2_id, direction, thickness, Q):
+        """Helper function that calculates and stores the shear stress of a glue line from its first moment of area."""
         if self.max_shear_force is None:
             V = self.max_shear_force_frame
         else: 
@@ -580,7 +931,7 @@ class Beam:
         glue_shear_stress = (V * Q) / (I * thickness)
 
         # Store shear stress for this glue pair
-        self.shear_stress[f"glue_{rect1_id}_{rect2_id}_{direction}"] = glue_shear_stress
+        self.glue_shear_stress[(rect1_id, rect2_id, direction)] = glue_shear_stress
 
         return glue_shear_stress
     
@@ -588,20 +939,15 @@ class Beam:
         """
         Calculate the factor of safety (FOS) for glue joints based on shear stress.
 
-        This method iterates through the shear stress values stored in the `shear_stress` dictionary
-        of the object, identifies the entries related to glue joints, and calculates the factor of 
-        safety for each glue joint by dividing the predefined shear strength of the glue 
-        (SHEAR_STRENGTH_GLUE) by the corresponding shear stress value. It returns the minimum factor 
-        of safety among all glue joints.
+        This method takes the shear stress values stored in the `glue_shear_stress` dictionary
+        of the object and calculates the factor of safety of the glue joints by dividing the
+        predefined shear strength of the glue (SHEAR_STRENGTH_GLUE) by the shear stress. The
+        minimum factor of safety among all glue joints is the one of the largest shear stress.
 
         Returns:
             float: The minimum factor of safety for the glue joints.
         """
-        FOS_glue = []
-        for key, value in self.shear_stress.items():
-            if "glue" in key:
-                FOS_glue.append(SHEAR_STRENGTH_GLUE / value)
-        self.FOS["glue"] = min(FOS_glue)
+        self.FOS["glue"] = SHEAR_STRENGTH_GLUE / max(self.glue_shear_stress.values())
         return self.FOS["glue"]
 
     def calculate_and_plot_failure_capacities(self, FOS):
@@ -623,20 +969,23 @@ class Beam:
             This method does not return any value. It generates and displays a plot of the failure capacities.
         """
         
-        x_values = np.linspace(0, len(self.shear_forces), len(self.shear_forces))  # x-axis values (normalized positions)
+        shear_forces = self._shear_forces_np
+        bending_moments = self._bending_moments_np
+        x_values = np.arange(len(shear_forces))  # x-axis values, one per evaluated position
 
         # Calculate failure capacities for bending moments
-        M_fail_tens = FOS["tensile"] * np.array(self.bending_moments)
-        M_fail_comp = FOS["compressive"] * np.array(self.bending_moments)
-        M_fail_buck = FOS["buckling_comp"] * np.array(self.bending_moments)
+        M_fail_tens = FOS["tensile"] * bending_moments
+        M_fail_comp = FOS["compressive"] * bending_moments
+        M_fail_buck = FOS["buckling_comp"] * bending_moments
 
         # Calculate failure capacities for shear forces
-        V_fail_shear = FOS["shear"] * np.array(self.shear_forces)
-        V_fail_glue = FOS["glue"] * np.array(self.shear_forces)
-        V_fail_buck = FOS["buckling_shear"] * np.array(self.shear_forces)
+        V_fail_shear = FOS["shear"] * shear_forces
+        V_fail_glue = FOS["glue"] * shear_forces
+        V_fail_buck = FOS["buckling_shear"] * shear_forces
 
         # Two subplots for moment-related and shear-related capacities
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12))
+        fig = Figure(figsize=(12, 12))
+        ax1, ax2 = fig.subplots(2, 1)
 
         # Plot moment-related capacities
         ax1.plot(x_values, M_fail_tens, label="M_fail_tens(x)", linestyle="--", color="blue")
@@ -659,7 +1008,7 @@ class Beam:
         ax2.grid()
 
         # Adjust layout with padding between plots
-        plt.tight_layout(pad=3.0)
+        fig.tight_layout(pad=3.0)
 
         # Streamlit output
         st.pyplot(fig)
\ No newline at end of file
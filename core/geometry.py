@@ -1,7 +1,12 @@
 from config import *
 import math
 import copy
+import numpy as np
+import pandas as pd
 class Rectangle:
+    # Fixed attributes, so instances have no per-instance __dict__
+    __slots__ = ("width", "height", "position", "position_x", "centroid", "centroid_x", "area")
+
     def __init__(self, width, height, position, position_x=None):
         self.width = width
         self.height = height
@@ -57,9 +62,25 @@ class Rectangle:
     def __repr__(self):
         return f"Rectangle(width={self.width}, height={self.height}, position={self.position}, position_x={self.position_x})"
     
+def _sum_in_order(values):
+    """
+    Sum an array one element after the other in rectangle order, the same way as accumulating the
+    rectangles in a loop, instead of NumPy's pairwise summation.
+    """
+    total = 0
+    for value in values.tolist():
+        total += value
+    return total
+
+# Structured dtype used by CrossSection to store its rectangles, one record per rectangle
+RECT_DTYPE = np.dtype([("width", "f8"), ("height", "f8"), ("position", "f8"), ("position_x", "f8")])
+
 class CrossSection:
+    # Fixed attributes, so instances have no per-instance __dict__
+    __slots__ = ("centroid", "centroid_x", "I", "glue_connections", "diaphragm_spacing", "buckling_capacity",
+                 "fos_buckling", "_dims", "_rows", "_rectangles", "json_cache", "_glue_df", "_first_moments")
+
     def __init__(self, diaphragm_spacing=0):
-        self.rectangles = []
         self.centroid = 0
         self.centroid_x = 0
         self.I = 0
@@ -67,6 +88,42 @@ class CrossSection:
         self.diaphragm_spacing = diaphragm_spacing  # Number of diaphragms
         self.buckling_capacity = {}
         self.fos_buckling = {}
+        # The rectangles are stored as a RECT_DTYPE array, Rectangle objects are only
+        # created on demand for the code paths that iterate over them
+        self._dims = np.empty(0, dtype=RECT_DTYPE)
+        self._rows = []  # The values of every rectangle as they were added, with their original types
+        self._rectangles = ()
+        self.json_cache = None  # Serialized geometry for download, cleared whenever the geometry changes
+        self._glue_df = None  # Table of glue connections for display, cleared whenever they change
+        self._first_moments = {}  # First moments of area by (centroid, glue line), cleared whenever the rectangles change
+
+    @property
+    def rectangles(self):
+        """
+        The rectangles of the cross section as a tuple of Rectangle objects.
+
+        The tuple is read-only, rectangles are added and removed with add_rectangle and
+        remove_rectangle so the backing array stays in step. After rectangles are added as an
+        array, the tuple is rebuilt the first time it is needed.
+        """
+        if self._rectangles is None:
+            self._rectangles = tuple(Rectangle(*row) for row in self._rows)
+        return self._rectangles
+
+    @property
+    def rows(self):
+        """
+        The width, height, position and position_x of every rectangle as tuples, with the
+        values as they were added (integers stay integers).
+        """
+        return self._rows
+
+    @property
+    def dimensions(self):
+        """
+        The width, height, position and position_x of every rectangle as a RECT_DTYPE array.
+        """
+        return self._dims
 
     def add_glue_connection(self, rect1_id, rect2_id, direction, thickness):
         """
@@ -81,12 +138,52 @@ class CrossSection:
         Returns:
         None
         """
-        self.glue_connections.append({
+        self.extend_glue_connections([{
             "rect1": rect1_id,
             "rect2": rect2_id,
             "direction": direction,
             "thickness": thickness
-        })
+        }])
+
+    def extend_glue_connections(self, connections):
+        """
+        Adds several glue connections at once.
+
+        Parameters:
+        connections (iterable of dict): Glue connections with the keys "rect1", "rect2",
+                                        "direction" and "thickness".
+
+        Returns:
+        None
+        """
+        self.glue_connections.extend({
+            "rect1": connection["rect1"],
+            "rect2": connection["rect2"],
+            "direction": connection["direction"],
+            "thickness": connection["thickness"]
+        } for connection in connections)
+        self.json_cache = None
+        self._glue_df = None
+
+    def glue_df(self):
+        """
+        Returns the glue connections as a DataFrame for display, with 1-based rectangle IDs.
+
+        The DataFrame is built once and reused until the glue connections change.
+
+        Returns:
+        pd.DataFrame: One row per glue connection.
+        """
+        if self._glue_df is None:
+            df = pd.DataFrame(self.glue_connections, columns=["rect1", "rect2", "direction", "thickness"])
+            df[["rect1", "rect2"]] += 1  # Convert IDs to 1-based for display
+            self._glue_df = df.rename(columns={
+                "rect1": "Rectangle 1 ID",
+                "rect2": "Rectangle 2 ID",
+                "direction": "Direction",
+                "thickness": "Thickness (mm)"
+            })
+        return self._glue_df
 
     def add_rectangle(self, rectangle):
         """
@@ -95,7 +192,43 @@ class CrossSection:
         Parameters:
         rectangle (Rectangle): The rectangle object to be added to the list.
         """
-        self.rectangles.append(rectangle)
+        self.extend_rectangles([rectangle])
+
+    def extend_rectangles(self, rectangles):
+        """
+        Adds several rectangles at once.
+
+        The backing array is grown with a single concatenation instead of once per rectangle.
+
+        Parameters:
+        rectangles (list of Rectangle): The rectangle objects to be added to the list.
+        """
+        if not rectangles:
+            return
+        if self._rectangles is not None:
+            self._rectangles += tuple(rectangles)
+        rows = [(rect.width, rect.height, rect.position, rect.position_x) for rect in rectangles]
+        self._rows.extend(rows)
+        self._dims = np.concatenate((self._dims, np.array(rows, dtype=RECT_DTYPE)))
+        self.json_cache = None
+        self._first_moments = {}
+
+    def extend_rectangle_array(self, dimensions, rows=None):
+        """
+        Adds several rectangles at once from an array, without creating Rectangle objects.
+
+        Parameters:
+        dimensions (np.ndarray): A RECT_DTYPE array with one record per rectangle.
+        rows (list of tuple, optional): The same rectangles as (width, height, position, position_x)
+                                        tuples with their original types. Taken from the array if omitted.
+        """
+        if len(dimensions) == 0:
+            return
+        self._rows.extend(dimensions.tolist() if rows is None else rows)
+        self._dims = np.concatenate((self._dims, dimensions.astype(RECT_DTYPE, copy=False)))
+        self._rectangles = None  # rebuilt from the array when needed
+        self.json_cache = None
+        self._first_moments = {}
 
     def remove_rectangle(self, rectangle):
         """
@@ -108,19 +241,30 @@ class CrossSection:
         None
         """
         if rectangle in self.rectangles:
-            self.rectangles.remove(rectangle)
+            index = self.rectangles.index(rectangle)
+            self._rectangles = self._rectangles[:index] + self._rectangles[index + 1:]
+            del self._rows[index]
+            self._dims = np.delete(self._dims, index)
+            self.json_cache = None
+            self._first_moments = {}
+
+    def _areas(self):
+        """
+        Helper function that returns the area of every rectangle as a NumPy array.
+        """
+        return self._dims["width"] * self._dims["height"]
 
     def calculate_total_area(self):
         """
         Calculate the total area of all rectangles.
 
-        This method iterates over all rectangles in the `self.rectangles` list
-        and sums their individual areas to compute the total area.
+        The individual areas are calculated as one NumPy array and summed in rectangle order,
+        like adding them one by one.
 
         Returns:
             float: The total area of all rectangles.
         """
-        return sum(rectangle.area for rectangle in self.rectangles)
+        return sum(self._areas().tolist())
 
     def calculate_centroid(self):
         """
@@ -138,8 +282,8 @@ class CrossSection:
         if total_area == 0:
             return 0  # Avoid division by zero if no rectangles are added
 
-        weighted_sum = sum(rectangle.area * rectangle.centroid for rectangle in self.rectangles)
-        centroid = weighted_sum / total_area
+        centroids = self._dims["position"] + self._dims["height"] / 2
+        centroid = sum((self._areas() * centroids).tolist()) / total_area  # summed in rectangle order
         self.centroid = centroid
         return centroid
     
@@ -159,8 +303,8 @@ class CrossSection:
         if total_area == 0:
             return 0
         
-        weighted_sum = sum(rectangle.area * rectangle.centroid_x for rectangle in self.rectangles)
-        centroid_x = weighted_sum / total_area
+        centroids_x = self._dims["position_x"] + self._dims["width"] / 2
+        centroid_x = sum((self._areas() * centroids_x).tolist()) / total_area  # summed in rectangle order
         self.centroid_x = centroid_x
         return centroid_x
 
@@ -176,27 +320,119 @@ class CrossSection:
         Returns:
             float: The total moment of inertia of the composite section.
         """
-        centroid_y = self.centroid
-        total_inertia = 0
-        for rectangle in self.rectangles:
-            I_centroid = rectangle.self_I()
-            distance = abs(rectangle.centroid - centroid_y)
-            I_parallel_axis = I_centroid + rectangle.area * distance**2
-            total_inertia += I_parallel_axis
+        width, height, position = self._dims["width"], self._dims["height"], self._dims["position"]
+        I_centroid = width * height ** 3 / 12
+        distance = position + height / 2 - self.centroid
+        total_inertia = _sum_in_order(I_centroid + self._areas() * distance ** 2)
         self.I = total_inertia
         return total_inertia
 
+    def calculate_all(self):
+        """
+        Calculate the total area, both centroids and the moment of inertia.
+
+        The rectangles are reduced to the area m00 and the first moments m10, which give the
+        centroids. All sums run in rectangle order, so the results match the separate methods. The moment of inertia is then summed about the centroid in a second pass,
+        like calculate_moment_of_inertia, since m20 - m00 * centroid^2 loses precision for
+        sections placed far from y = 0.
+
+        Returns:
+            tuple: The total area, centroid (Y), centroid (X) and moment of inertia.
+            The centroids and moment of inertia are 0 if no rectangles are added.
+        """
+        width, height, position, position_x = (self._dims[name] for name in RECT_DTYPE.names)
+        areas = width * height
+        centroids = position + height / 2
+        m00 = sum(areas.tolist())
+        if m00 == 0:
+            return 0, 0, 0, 0  # Avoid division by zero if no rectangles are added
+
+        m10_y = sum((areas * centroids).tolist())
+        m10_x = sum((areas * (position_x + width / 2)).tolist())
+
+        self.centroid = m10_y / m00
+        self.centroid_x = m10_x / m00
+        self.I = _sum_in_order(width * height ** 3 / 12 + areas * (centroids - self.centroid) ** 2)
+        return m00, self.centroid, self.centroid_x, self.I
+
+    def calculate_centroid_first_moment(self):
+        """
+        Calculate the first moment of area below the centroid and the width at the centroidal axis.
+
+        Rectangles that intersect the centroid contribute the part below it, and rectangles strictly
+        below it contribute their whole area. The result only depends on the rectangles and the
+        centroid, so it is kept until either of them changes.
+
+        Returns:
+            tuple: The first moment of area (Q) and the width at the centroidal axis (b).
+        """
+        key = (self.centroid, None)
+        if key not in self._first_moments:
+            centroid = self.centroid
+
+            # Bottom position and top position of every rectangle
+            width = self._dims["width"]
+            bottom = self._dims["position"]
+            top = bottom + self._dims["height"]
+
+            # Rectangles that intersect the centroid, and rectangles strictly below it
+            crosses = (bottom <= centroid) & (centroid <= top)
+            below = ~crosses & (top < centroid)
+
+            # Area of the portion below the centroid for intersecting rectangles, whole area otherwise
+            height_below = centroid - bottom
+            area_below = height_below * width
+            contributions = np.where(crosses, area_below * np.abs(height_below/2 - centroid),
+                                     self._areas() * np.abs((bottom + self._dims["height"] / 2) - centroid))
+
+            # Accumulate in rectangle order, like adding the rectangles one by one
+            Q = sum(contributions[crosses | below].tolist())
+            b = sum(width[crosses].tolist())
+            self._first_moments[key] = (Q, b)
+        return self._first_moments[key]
+
+    def calculate_glue_first_moments(self, edges):
+        """
+        Calculate Q (first moment of area above/below the glue line) for horizontal glue lines.
+
+        The contribution of every rectangle is calculated once and shared by all glue lines, which each
+        select the rectangles above/below them with a boolean mask. The results are kept until the
+        rectangles or the centroid change.
+
+        Parameters:
+        edges (list of float): The heights of the glue lines.
+
+        Returns:
+            list: The first moment of area of each glue line.
+        """
+        centroid = self.centroid
+        missing = [edge for edge in dict.fromkeys(edges) if (centroid, edge) not in self._first_moments]
+        if missing:
+            position = self._dims["position"]
+            contributions = self._areas() * np.abs((position + self._dims["height"] / 2) - centroid)
+
+            missing_edges = np.asarray(missing, dtype=np.float64)[:, None]
+            outside = ((centroid < missing_edges) & (missing_edges <= position)) | \
+                      ((position <= missing_edges) & (missing_edges < centroid))
+            for edge, mask in zip(missing, outside):
+                self._first_moments[(centroid, edge)] = sum(contributions[mask].tolist())  # accumulated in rectangle order
+        return [self._first_moments[(centroid, edge)] for edge in edges]
+
     def get_max_y(self):
         """
         Calculate the maximum vertical distance from the centroid to the top and bottom edges of the rectangles.
 
+        The edges are read from the rectangle array, without going through Rectangle objects.
+
         Returns:
             tuple: A tuple containing two floats:
                 - The distance from the centroid to the top edge.
                 - The distance from the centroid to the bottom edge.
         """
-        top = max([rect.centroid + rect.height / 2 for rect in self.rectangles])
-        bottom = min([rect.centroid - rect.height / 2 for rect in self.rectangles])
+        height = self._dims["height"]
+        centroids = self._dims["position"] + height / 2
+        top = float((centroids + height / 2).max())
+        bottom = float((centroids - height / 2).min())
         centroid_y = self.centroid
         return top - centroid_y, centroid_y - bottom
     
@@ -224,7 +460,7 @@ class CrossSection:
             "3": [],  # Unbounded
         }
         # Copy the list of rectangles to avoid modifying the original
-        rectangles = copy.deepcopy(self.rectangles)
+        rectangles = copy.deepcopy(list(self.rectangles))
 
         # Filter out rectangles not in the top compression region
         for rectangle in rectangles[:]:
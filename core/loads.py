@@ -1,4 +1,6 @@
 from config import *
+import numpy as np
+
 class TrainLoad:
     def __init__(self, total_weight, base_positions, train_position, weight_per_wheel, bridge_length=1200):
         self.total_weight = total_weight  # Total weight of the train (N)
@@ -6,32 +8,66 @@ class TrainLoad:
         self.bridge_length = bridge_length  # Length of the bridge (mm)
         self.train_position = train_position  # Current position of the train on the bridge (mm)
         self.base_positions = base_positions  # Base positions of the wheels (mm)
-        self.wheel_positions = [sum(base_positions[:i+1]) + train_position 
-                                for i in range(len(base_positions))]
+        # Absolute wheel positions, the cumulative sum of the spacings shifted by the train position
+        self.wheel_positions = np.cumsum(np.asarray(base_positions, dtype=np.float64)) + train_position
+        self._weights = np.asarray(weight_per_wheel, dtype=np.float64)  # Converted once, reused by every get_loads call
+        self._loads = None  # Cached result of get_loads, cleared whenever the wheels move
+        self._load_arrays = None  # Cached result of get_loads_arrays, cleared whenever the wheels move
+        self._loads_length = None  # Bridge length the cached loads were calculated for
+
+    def cache_key(self):
+        """
+        Return a hashable summary of the inputs that define this train load.
+
+        Two train loads with the same key produce the same wheel loads, so it is used
+        to cache the objects built from a train load.
+
+        Returns:
+            tuple: The total weight, train position, bridge length, weights per wheel and wheel spacings.
+        """
+        return (self.total_weight, self.train_position, self.bridge_length,
+                tuple(np.asarray(self.weight_per_wheel).tolist()),
+                tuple(np.asarray(self.base_positions).tolist()))
 
     def get_loads(self):
         """
         Calculate the loads on the bridge based on wheel positions and weights.
 
-        This method iterates through the wheel positions and determines if each
-        wheel is within the bounds of the bridge. If a wheel is within the bounds,
-        its corresponding weight is added to the loads list. If a wheel is outside
-        the bounds, a load of 0 is added for that position.
+        This method pairs up the arrays of get_loads_arrays. If a wheel is within the
+        bounds of the bridge, its corresponding weight is added to the loads list. If a
+        wheel is outside the bounds, a load of 0 is added for that position. The result
+        is cached until the wheels move or the bridge length changes.
 
         Returns:
             list of tuple: A list of tuples where each tuple contains the position
             of the wheel and the corresponding load (weight). If the wheel is
             outside the bounds, the load is 0.
         """
-        lower_bound = 0  # Set your lower bound here
-        upper_bound = self.bridge_length  # Set your upper bound here
-        loads = []
-        for idx, position in enumerate(self.wheel_positions):
-            if lower_bound <= position <= upper_bound:
-                loads.append((position, self.weight_per_wheel[idx]))
-            else:
-                loads.append((position, 0))
-        return loads
+        # Reuse the loads until the wheels move or the bridge length changes
+        if self._loads is None or self._loads_length != self.bridge_length:
+            positions, weights = self.get_loads_arrays()
+            self._loads = list(zip(positions.tolist(), weights.tolist()))
+        return self._loads
+
+    def get_loads_arrays(self):
+        """
+        Calculate the loads on the bridge as two parallel arrays of wheel positions and weights.
+
+        Wheels outside the bounds of the bridge carry a load of 0, like in get_loads. The arrays
+        can be passed straight to the vectorized calculations, without building the list of tuples.
+        They are cached until the wheels move or the bridge length changes, so they must not be modified.
+
+        Returns:
+            tuple: Two float64 arrays, the positions of the wheels and the corresponding loads (weights).
+        """
+        if self._load_arrays is None or self._loads_length != self.bridge_length:
+            on_bridge = (self.wheel_positions >= 0) & (self.wheel_positions <= self.bridge_length)
+            positions = np.array(self.wheel_positions, dtype=np.float64)
+            weights = np.where(on_bridge, self._weights, 0).astype(np.float64, copy=False)
+            self._load_arrays = (positions, weights)
+            self._loads = None  # the list is rebuilt from the new arrays
+            self._loads_length = self.bridge_length
+        return self._load_arrays
     
     def update_load_positions(self, shift_distance=1, direction=1):
         """
@@ -48,10 +84,10 @@ class TrainLoad:
         Returns:
         None
         """
-        self.wheel_positions = [
-            pos + shift_distance*direction for pos in self.wheel_positions
-        ]
+        self.wheel_positions = self.wheel_positions + shift_distance*direction
         self.train_position += shift_distance*direction
+        self._loads = None
+        self._load_arrays = None
 
     def set_train_left(self):
         """
@@ -63,7 +99,9 @@ class TrainLoad:
         distances from the leftmost position.
         """
         self.train_position = 0
-        self.wheel_positions = [-856, -680, -504, -340, -176, 0] # this is constant
+        self.wheel_positions = np.array([-856, -680, -504, -340, -176, 0], dtype=np.float64) # this is constant
+        self._loads = None
+        self._load_arrays = None
 
     def set_train_right(self):
         """
@@ -74,7 +112,9 @@ class TrainLoad:
 
         Attributes:
             train_position (float): The position of the train on the bridge.
-            wheel_positions (list of float): The positions of the train's wheels on the bridge.
+            wheel_positions (np.ndarray): The positions of the train's wheels on the bridge.
         """
         self.train_position = self.bridge_length
-        self.wheel_positions = [self.bridge_length + pos for pos in [0, 176, 340, 504, 680, 856]]
+        self.wheel_positions = self.bridge_length + np.array([0, 176, 340, 504, 680, 856], dtype=np.float64)
+        self._loads = None
+        self._load_arrays = None
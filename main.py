@@ -65,7 +65,7 @@ def main():
         stress_data["Value (N/mm²)"][2] = round(max_shear, 3)
         if beam.cross_section.glue_connections:
             beam.calculate_glue_shear()
-            max_glue_shear = max(value for key, value in beam.shear_stress.items() if "glue" in key)
+            max_glue_shear = max(beam.glue_shear_stress.values())
             stress_data["Type"].append("Maximum Glue Shear Stress")
             stress_data["Value (N/mm²)"].append(round(max_glue_shear, 3))
             FOS_glue = beam.calculate_glue_fos()
@@ -0,0 +1,145 @@
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from config import TRAIN_LENGTH
+from core import Beam, TrainLoad
+from core.beam import _round_to_tenth
+
+BASE_POSITIONS = [52, 176, 164, 176, 164, 176]
+
+
+def reference_sfd_bmd(loads, length):
+    """Calculate the reactions and rounded diagrams one position and one load at a time."""
+    total_load = sum(load[1] for load in loads)
+    RB = sum(load[1] * load[0] for load in loads) / length
+    RA = total_load - RB
+
+    shear_forces = []
+    bending_moments = []
+    for x in range(0, int(length) + 1):
+        shear_force = RA
+        for load_pos, load_mag in loads:
+            if load_pos <= x:
+                shear_force -= load_mag
+        shear_forces.append(round(shear_force, 1))
+
+        bending_moment = RA * x
+        for load_pos, load_mag in loads:
+            if load_pos <= x:
+                bending_moment -= load_mag * (x - load_pos)
+        bending_moments.append(round(bending_moment, 1))
+
+    return {'A': RA, 'B': RB}, shear_forces, bending_moments
+
+
+def reference_sweep(train_load, length, left):
+    """Calculate the diagrams of every train position of a sweep, moving the train 1 mm at a time."""
+    train_load.bridge_length = length
+    if left:
+        train_load.set_train_left()
+    else:
+        train_load.set_train_right()
+
+    steps = []
+    while (left and train_load.wheel_positions[0] <= length) or (not left and train_load.wheel_positions[-1] >= 0):
+        loads = train_load.get_loads()
+        steps.append(reference_sfd_bmd(loads, length)[1:])
+        train_load.update_load_positions(direction=1 if left else -1)
+    return steps
+
+
+def reference_extrema(data):
+    """Find the largest positive and most negative values of an envelope with their train locations."""
+    max_pos = max(((idx - TRAIN_LENGTH, val) for idx, val in enumerate(data) if val > 0),
+                  default=(None, 0), key=lambda x: x[1])
+    min_neg = min(((idx - TRAIN_LENGTH, val) for idx, val in enumerate(data) if val < 0),
+                  default=(None, 0), key=lambda x: x[1])
+    return max_pos, min_neg
+
+
+def make_train(total_weight=452.7, train_position=0.0):
+    """Build a Load Case 2 (subsequent pass) train, so the wheels carry different loads."""
+    freight_mid = total_weight / 3.45
+    freight_end = freight_mid * 1.1
+    locomotive = freight_end * 1.35
+    weight_per_wheel = [freight_end / 2, freight_end / 2, freight_mid / 2, freight_mid / 2, locomotive / 2, locomotive / 2]
+    return TrainLoad(total_weight=total_weight, weight_per_wheel=weight_per_wheel,
+                     base_positions=BASE_POSITIONS, train_position=train_position)
+
+
+class RoundToTenthTest(unittest.TestCase):
+    def test_matches_python_round_near_halfway_points(self):
+        values = [0.05, 0.15, 0.25, 0.35, 0.45, 1.45, 2.675, -0.05, -0.15, -0.35, -1.45,
+                  1e6 + 0.05, -1e6 - 0.15, 12345.65, 0.0, -0.0]
+        rng = random.Random(3)
+        for _ in range(2000):
+            halfway = rng.randint(-10 ** 6, 10 ** 6) / 10 + 0.05
+            values.extend([halfway, np.nextafter(halfway, np.inf), np.nextafter(halfway, -np.inf)])
+        values.extend(rng.uniform(-1e5, 1e5) for _ in range(2000))
+
+        rounded = _round_to_tenth(np.array(values, dtype=np.float64))
+        self.assertEqual(rounded, [round(float(value), 1) for value in values])
+
+
+class FrameAnalysisTest(unittest.TestCase):
+    def test_matches_reference_loop(self):
+        for length in (1200.0, 950.5, 300.0):
+            for train_position in (-12.7, 0.3, 55.5, 400.2):
+                with self.subTest(length=length, train_position=train_position):
+                    beam = Beam(length, ['A', 'B'], make_train(train_position=train_position))
+                    reactions, shear_forces, bending_moments = reference_sfd_bmd(beam.loads, length)
+
+                    self.assertEqual(beam.reaction_forces, reactions)
+                    self.assertEqual(beam.shear_forces, shear_forces)
+                    self.assertEqual(beam.bending_moments, bending_moments)
+                    self.assertEqual(beam.calculate_sfd_bmd(), (shear_forces, bending_moments))
+
+
+class SweepTest(unittest.TestCase):
+    length = 150.5
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = {left: reference_sweep(make_train(), cls.length, left) for left in (True, False)}
+
+    def test_envelopes_match_reference_loop(self):
+        for left in (True, False):
+            with self.subTest(left=left), mock.patch("core.beam.st.pyplot"):
+                steps = self.reference[left]
+                max_shear = [max(values) for values in zip(*(shear for shear, _ in steps))]
+                min_shear = [min(values) for values in zip(*(shear for shear, _ in steps))]
+                max_moment = [max(values) for values in zip(*(moment for _, moment in steps))]
+
+                beam = Beam(self.length, ['A', 'B'], make_train())
+                extrema = beam.generate_sfe_bme(left=left)
+
+                self.assertEqual(beam.shear_forces_max_envelope, max_shear)
+                self.assertEqual(beam.shear_forces_min_envelope, min_shear)
+                self.assertEqual(beam.bending_moments_envelope, max_moment)
+                self.assertEqual(extrema, (
+                    (max_shear.index(max(max_shear)), max(max_shear)),
+                    (min_shear.index(min(min_shear)), min(min_shear)),
+                    (max_moment.index(max(max_moment, key=abs)), max(max_moment, key=abs)),
+                    (max_moment.index(min(max_moment, key=abs)), min(max_moment, key=abs)),
+                ))
+
+    def test_loading_characteristic_matches_reference_loop(self):
+        for left in (True, False):
+            with self.subTest(left=left):
+                steps = self.reference[left]
+                shear_envelope = [max(shear, key=abs) for shear, _ in steps]
+                moment_envelope = [max(moment, key=abs) for _, moment in steps]
+
+                beam = Beam(self.length, ['A', 'B'], make_train())
+                result = beam.generate_loading_characteristic(left=left)
+
+                self.assertEqual(beam.shear_forces_envelope, shear_envelope)
+                self.assertEqual(beam.bending_moments_envelope, moment_envelope)
+                self.assertEqual(result, (*reference_extrema(shear_envelope), *reference_extrema(moment_envelope)))
+
+
+if __name__ == "__main__":
+    unittest.main()